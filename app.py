@@ -1,9 +1,11 @@
 import calendar
 import datetime as dt
+import io
 import streamlit as st
 
 from storage.repo import save_data, load_data
-from scheduler.engine import generate_free_slots, build_week_plan
+from storage.catalog import Catalog, iter_csv_rows, iter_json_rows
+from scheduler.engine import generate_free_slots, build_week_plan, repair_week_plan, feasibility_report
 from scheduler.models import (
     Day,
     DAYS_IN_ORDER,
@@ -22,6 +24,10 @@ if "lectures" not in st.session_state:
     st.session_state.lectures = []
 if "prefs" not in st.session_state:
     st.session_state.prefs = Preferences()
+if "week_plans" not in st.session_state:
+    st.session_state.week_plans = {}
+if "catalog" not in st.session_state:
+    st.session_state.catalog = Catalog()
 
 st.markdown(
     """
@@ -64,6 +70,8 @@ def course_from_label(label: str) -> str:
         return label[len("Study:") :].strip()
     if label.startswith("Lecture:"):
         return label[len("Lecture:") :].strip()
+    if label.startswith("Exam:"):
+        return label[len("Exam:") :].strip()
     return ""
 
 def build_course_colors(lectures: list[Lecture]) -> dict[str, str]:
@@ -77,6 +85,31 @@ def build_course_colors(lectures: list[Lecture]) -> dict[str, str]:
 def day_enum_from_date(date_obj: dt.date) -> Day:
     return DAYS_IN_ORDER[date_obj.weekday()]
 
+def planner_key(prefs: Preferences, seed: int) -> tuple:
+    return (
+        seed,
+        prefs.candidate_count,
+        prefs.construction,
+        prefs.beam_width,
+        prefs.weight_spread,
+        prefs.weight_late,
+        prefs.weight_day_overload,
+        prefs.weight_gap_bonus,
+    )
+
+def week_plan_for(data: InputData, seed: int) -> list:
+    key = planner_key(data.prefs, seed)
+    snapshot = data.model_dump_json()
+    cached = st.session_state.week_plans.get(key)
+    if cached is None:
+        plan = build_week_plan(data, seed=seed)
+    elif cached[0] == snapshot:
+        return cached[1]
+    else:
+        plan = repair_week_plan(data, cached[1], seed=seed)
+    st.session_state.week_plans[key] = (snapshot, plan)
+    return plan
+
 def block_html(label: str, start: int, end: int, color: str) -> str:
     text = f"{minutes_to_hhmm(start)}–{minutes_to_hhmm(end)} {label}"
     safe = (
@@ -131,6 +164,8 @@ with st.sidebar:
     st.divider()
     st.subheader("planner quality")
     candidate_count = st.selectbox("candidate schedules", [5, 10, 20, 30, 50, 75, 100], index=[5, 10, 20, 30, 50, 75, 100].index(prefs.candidate_count if prefs.candidate_count in [5, 10, 20, 30, 50, 75, 100] else 30))
+    construction = st.selectbox("construction", ["random", "beam"], index=["random", "beam"].index(prefs.construction if prefs.construction in ["random", "beam"] else "random"))
+    beam_width = st.selectbox("beam width", [2, 4, 8, 16], index=[2, 4, 8, 16].index(prefs.beam_width if prefs.beam_width in [2, 4, 8, 16] else 4))
     weight_spread = st.slider("spread across week", 0.0, 3.0, float(prefs.weight_spread), 0.1)
     weight_late = st.slider("avoid late study", 0.0, 3.0, float(prefs.weight_late), 0.1)
     weight_day_overload = st.slider("avoid overloaded days", 0.0, 3.0, float(prefs.weight_day_overload), 0.1)
@@ -154,6 +189,8 @@ with st.sidebar:
         prefs.prefer_blocks_per_day_max = int(per_day)
         prefs.buffer_minutes = int(buffer_minutes)
         prefs.candidate_count = int(candidate_count)
+        prefs.construction = str(construction)
+        prefs.beam_width = int(beam_width)
         prefs.weight_spread = float(weight_spread)
         prefs.weight_late = float(weight_late)
         prefs.weight_day_overload = float(weight_day_overload)
@@ -210,7 +247,7 @@ with tab1:
                 st.caption("enter valid start/end times to preview target study time")
 
         try:
-            st.session_state.lectures[idx] = Lecture(
+            updated = dict(
                 course_name=(str(cname).strip() or "untitled course"),
                 day=Day([d for d in Day if d.value == day][0]),
                 start=hhmm_to_minutes(start),
@@ -219,6 +256,8 @@ with tab1:
                 online=bool(online),
                 color_hex=str(color_hex).strip() or "#4e79a7",
             )
+            if any(getattr(lec, k) != v for k, v in updated.items()):
+                st.session_state.lectures[idx] = Lecture(**updated)
         except Exception:
             st.warning("lecture times must be hh:mm")
 
@@ -228,14 +267,59 @@ with tab1:
         )
         st.rerun()
 
+    st.divider()
+    st.subheader("import timetable")
+    catalog: Catalog = st.session_state.catalog
+    upload = st.file_uploader("registrar export (csv or json)", type=["csv", "json", "jsonl"])
+    if upload is not None and st.button("import sections"):
+        text = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+        rows = iter_csv_rows(text) if upload.name.lower().endswith(".csv") else iter_json_rows(text)
+        try:
+            stats = catalog.import_rows(rows)
+        except Exception as e:
+            st.error(f"import failed: {e}")
+        else:
+            st.success(
+                f"added {stats.added} • changed {stats.changed} • unchanged {stats.unchanged} • "
+                f"removed {stats.removed} • dropped invalid {stats.dropped}"
+            )
+            if stats.errors:
+                st.warning(f"{len(stats.errors)} rows skipped • first: {stats.errors[0]}")
+
+    if len(catalog):
+        icol1, icol2, icol3 = st.columns([2, 1, 1])
+        with icol1:
+            pick_course = st.selectbox("catalog course", catalog.courses())
+        with icol2:
+            pick_section = st.selectbox("section", ["all"] + catalog.sections(pick_course))
+        with icol3:
+            if st.button("add course"):
+                section = None if pick_section == "all" else pick_section
+                st.session_state.lectures.extend(catalog.lectures(pick_course, section))
+                st.rerun()
+
     st.divider()
     st.subheader("weekly study targets (computed)")
     targets = compute_course_targets(st.session_state.lectures)
     if not targets:
         st.caption("add at least one lecture to compute targets")
     else:
-        rows = [{"course": k, "target_minutes": v, "target_hours": round(v / 60, 2)} for k, v in sorted(targets.items())]
+        report = feasibility_report(InputData(lectures=st.session_state.lectures, prefs=st.session_state.prefs))
+        rows = [
+            {
+                "course": k,
+                "target_minutes": v,
+                "target_hours": round(v / 60, 2),
+                "max_achievable_minutes (upper bound)": report.course_cap.get(k, 0),
+            }
+            for k, v in sorted(targets.items())
+        ]
         st.dataframe(rows, use_container_width=True)
+        if not report.feasible:
+            st.warning(
+                f"targets need {report.total_target} min but at most {report.total_capacity} min fit in free time "
+                f"(short by {report.shortfall} min) • study targets are capped to what fits"
+            )
 
 with tab2:
     st.subheader("availability (free study slots)")
@@ -262,6 +346,7 @@ with tab3:
     month_weeks = list(cal.monthdatescalendar(int(view_year), int(view_month)))
 
     week_plans: list[tuple[list[dt.date], dict[dt.date, list]]] = []
+    shown_keys: set[tuple] = set()
     for week in month_weeks:
         anchor = next((d for d in week if d.month == int(view_month)), week[0])
         iso = anchor.isocalendar()
@@ -269,7 +354,8 @@ with tab3:
         if week_variation == "off":
             seed = int(view_year) * 10000 + int(view_month) * 100 + 1
 
-        plan = build_week_plan(data, seed=seed)
+        plan = week_plan_for(data, seed)
+        shown_keys.add(planner_key(data.prefs, seed))
         by_weekday: dict[int, list] = {i: [] for i in range(7)}
         for b in plan:
             by_weekday[DAYS_IN_ORDER.index(b.day)].append(b)
@@ -282,6 +368,9 @@ with tab3:
             date_map[d] = by_weekday.get(wd, [])
         week_plans.append((week, date_map))
 
+    for key in [k for k in st.session_state.week_plans if k not in shown_keys]:
+        del st.session_state.week_plans[key]
+
     headers = st.columns(7)
     for i, name in enumerate(["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]):
         headers[i].markdown(f"**{name}**")
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from scheduler.engine import (
+    build_week_plan,
+    expand_interval,
+    is_free,
+    reserve_sleep_week_abs,
+    week_busy_by_day,
+)
+from scheduler.models import DAYS_IN_ORDER, Day, InputData, StudyRoom, TimeBlock
+from scheduler.scoring import course_from_label
+
+WEEK_MINUTES = len(DAYS_IN_ORDER) * 24 * 60
+
+
+class RoomOccupancy:
+    def __init__(self, room: StudyRoom) -> None:
+        self.room = room
+        self.counts = array("H", bytes(2 * WEEK_MINUTES))
+
+    def peak(self, start_abs: int, end_abs: int) -> int:
+        if end_abs <= start_abs:
+            return 0
+        return max(self.counts[start_abs:end_abs])
+
+    def fits(self, start_abs: int, end_abs: int) -> bool:
+        return self.peak(start_abs, end_abs) < self.room.capacity
+
+    def add(self, start_abs: int, end_abs: int) -> None:
+        counts = self.counts
+        for t in range(start_abs, end_abs):
+            counts[t] += 1
+
+
+@dataclass(frozen=True)
+class RoomBooking:
+    student: str
+    room: str
+    day: Day
+    start: int
+    end: int
+
+
+@dataclass
+class CohortPlan:
+    plans: Dict[str, List[TimeBlock]] = field(default_factory=dict)
+    bookings: List[RoomBooking] = field(default_factory=list)
+    unroomed: Dict[str, List[TimeBlock]] = field(default_factory=dict)
+
+
+def _abs_span(day: Day, start: int, end: int) -> Tuple[int, int]:
+    base = DAYS_IN_ORDER.index(day) * 24 * 60
+    return base + start, base + end
+
+
+def _plan_one(args: Tuple[InputData, int]) -> List[TimeBlock]:
+    data, seed = args
+    return build_week_plan(data, seed=seed)
+
+
+def _free_room(rooms: List[RoomOccupancy], day: Day, start: int, end: int) -> Optional[RoomOccupancy]:
+    s_abs, e_abs = _abs_span(day, start, end)
+    for occ in rooms:
+        if occ.fits(s_abs, e_abs):
+            return occ
+    return None
+
+
+SlotKey = Tuple[int, int, int, int]
+OpenSlots = Dict[Day, List[Tuple[int, RoomOccupancy]]]
+
+
+def _open_room_slots(
+    dur: int,
+    step: int,
+    earliest: int,
+    latest: int,
+    rooms: List[RoomOccupancy],
+    cache: Dict[SlotKey, OpenSlots],
+) -> OpenSlots:
+    key = (dur, step, earliest, latest)
+    found = cache.get(key)
+    if found is not None:
+        return found
+
+    found = {}
+    for day in DAYS_IN_ORDER:
+        for t in range(earliest, latest - dur + 1, step):
+            occ = _free_room(rooms, day, t, t + dur)
+            if occ is not None:
+                found.setdefault(day, []).append((t, occ))
+    cache[key] = found
+    return found
+
+
+def _book(
+    occ: RoomOccupancy,
+    day: Day,
+    start: int,
+    end: int,
+    rooms: List[RoomOccupancy],
+    cache: Dict[SlotKey, OpenSlots],
+) -> None:
+    occ.add(*_abs_span(day, start, end))
+    for (dur, _, _, _), open_slots in cache.items():
+        slots = open_slots.get(day)
+        if not slots:
+            continue
+        updated: List[Tuple[int, RoomOccupancy]] = []
+        for t, o in slots:
+            if o is occ and t < end and start < t + dur:
+                o = _free_room(rooms, day, t, t + dur)
+                if o is None:
+                    continue
+            updated.append((t, o))
+        open_slots[day] = updated
+
+
+def _relocate(
+    data: InputData,
+    plan: List[TimeBlock],
+    block: TimeBlock,
+    base_busy: Dict[Day, List[Tuple[int, int]]],
+    rooms: List[RoomOccupancy],
+    slot_cache: Dict[SlotKey, OpenSlots],
+) -> Optional[Tuple[TimeBlock, RoomOccupancy]]:
+    prefs = data.prefs
+    dur = block.end - block.start
+    step = max(1, prefs.slot_minutes)
+    open_slots = _open_room_slots(dur, step, prefs.earliest_start, prefs.latest_end, rooms, slot_cache)
+    if not open_slots:
+        return None
+
+    busy_by_day = {d: list(v) for d, v in base_busy.items()}
+    blocks_per_day: Dict[Day, int] = {d: 0 for d in DAYS_IN_ORDER}
+    for b in plan:
+        if b is block or not course_from_label(b.label):
+            continue
+        busy_by_day[b.day].append(expand_interval(b.start, b.end, prefs.buffer_minutes))
+        blocks_per_day[b.day] += 1
+
+    days = [block.day] + [d for d in DAYS_IN_ORDER if d != block.day]
+    for day in days:
+        if day != block.day and blocks_per_day[day] >= prefs.prefer_blocks_per_day_max:
+            continue
+        candidates = sorted(open_slots.get(day, []), key=lambda c: abs(c[0] - block.start))
+        for t, occ in candidates:
+            if (day, t) == (block.day, block.start):
+                continue
+            if is_free(t, t + dur, busy_by_day[day]):
+                return TimeBlock(day=day, start=t, end=t + dur, label=block.label), occ
+    return None
+
+
+def _assign_rooms(
+    student: str,
+    data: InputData,
+    plan: List[TimeBlock],
+    rooms: List[RoomOccupancy],
+    out: CohortPlan,
+    slot_cache: Dict[SlotKey, OpenSlots],
+) -> None:
+    plan = list(plan)
+    unroomed: List[TimeBlock] = []
+    base_busy: Optional[Dict[Day, List[Tuple[int, int]]]] = None
+
+    for i, block in enumerate(plan):
+        if not course_from_label(block.label):
+            continue
+        occ = _free_room(rooms, block.day, block.start, block.end)
+        if occ is None:
+            if base_busy is None:
+                base_busy = week_busy_by_day(data, reserve_sleep_week_abs(data))
+            moved = _relocate(data, plan, block, base_busy, rooms, slot_cache)
+            if moved is None:
+                unroomed.append(block)
+                continue
+            block, occ = moved
+            plan[i] = block
+        _book(occ, block.day, block.start, block.end, rooms, slot_cache)
+        out.bookings.append(RoomBooking(student=student, room=occ.room.name, day=block.day, start=block.start, end=block.end))
+
+    plan.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
+    out.plans[student] = plan
+    if unroomed:
+        out.unroomed[student] = unroomed
+
+
+def plan_cohort(
+    students: Mapping[str, InputData],
+    rooms: List[StudyRoom],
+    seed: int = 1,
+    batch_size: int = 64,
+    workers: int = 0,
+) -> CohortPlan:
+    occupancy = [RoomOccupancy(r) for r in rooms]
+    slot_cache: Dict[SlotKey, OpenSlots] = {}
+    out = CohortPlan()
+    ids = list(students)
+    size = max(1, int(batch_size))
+    starts = list(range(0, len(ids), size))
+    if not starts:
+        return out
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    mapper = pool.map if pool is not None else map
+
+    def submit(b0: int):
+        jobs = [(students[sid], int(seed) + b0 + i) for i, sid in enumerate(ids[b0 : b0 + size])]
+        return mapper(_plan_one, jobs)
+
+    try:
+        pending = submit(starts[0])
+        for k, b0 in enumerate(starts):
+            plans = list(pending)
+            if k + 1 < len(starts):
+                pending = submit(starts[k + 1])
+            for sid, plan in zip(ids[b0 : b0 + size], plans):
+                _assign_rooms(sid, students[sid], plan, occupancy, out, slot_cache)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return out
@@ -4,15 +4,18 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List, Tuple
 
+from scheduler.feasibility import FeasibilityReport, analyze_feasibility
 from scheduler.models import (
     Day,
     DAYS_IN_ORDER,
     InputData,
     TimeBlock,
+    block_bounds,
     compute_course_targets,
     overlaps,
+    round_down_to_slot,
 )
-from scheduler.scoring import score_plan
+from scheduler.scoring import course_from_label, score_plan
 
 
 @dataclass(frozen=True)
@@ -26,13 +29,13 @@ def _clamp(v: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, v))
 
 
-def _expand_interval(start: int, end: int, buffer_minutes: int) -> Tuple[int, int]:
+def expand_interval(start: int, end: int, buffer_minutes: int) -> Tuple[int, int]:
     s = _clamp(start - buffer_minutes, 0, 24 * 60)
     e = _clamp(end + buffer_minutes, 0, 24 * 60)
     return s, e
 
 
-def _is_free(start: int, end: int, busy: List[Tuple[int, int]]) -> bool:
+def is_free(start: int, end: int, busy: List[Tuple[int, int]]) -> bool:
     return all(not overlaps(start, end, b0, b1) for (b0, b1) in busy)
 
 
@@ -49,7 +52,7 @@ def _lecture_busy_abs(data: InputData) -> List[Tuple[int, int]]:
             continue
         day_i = DAYS_IN_ORDER.index(lec.day)
         base = day_i * 24 * 60
-        s, e = _expand_interval(lec.start, lec.end, buf)
+        s, e = expand_interval(lec.start, lec.end, buf)
         out.append((base + s, base + e))
     out.sort()
     return out
@@ -75,7 +78,7 @@ def _shift_interval_forward_until_free(
     t0 = start_abs
     t1 = start_abs + duration
     while t1 <= search_limit_abs:
-        if _is_free(t0, t1, busy_abs):
+        if is_free(t0, t1, busy_abs):
             return t0, t1
         t0 += step
         t1 += step
@@ -108,6 +111,24 @@ def reserve_sleep_week_abs(data: InputData) -> List[Tuple[int, int]]:
     return sleep_abs
 
 
+def reuse_sleep_week_abs(data: InputData, sleep_abs: List[Tuple[int, int]]) -> List[Tuple[int, int]] | None:
+    """Return sleep_abs if reserve_sleep_week_abs(data) would place exactly the same nights.
+
+    Holds when every night sits at its preferred start and none of data's lectures overlap it.
+    """
+    prefs = data.prefs
+    dur = _sleep_duration(prefs)
+    if len(sleep_abs) != (len(DAYS_IN_ORDER) if dur > 0 else 0):
+        return None
+    for day_i, (s, e) in enumerate(sleep_abs):
+        if s != day_i * 24 * 60 + prefs.sleep_start or e - s != dur:
+            return None
+    lecture_busy = _lecture_busy_abs(data)
+    if not all(is_free(s, e, lecture_busy) for s, e in sleep_abs):
+        return None
+    return sleep_abs
+
+
 def _sleep_busy_by_day(data: InputData, sleep_abs: List[Tuple[int, int]]) -> Dict[Day, List[Tuple[int, int]]]:
     buf = data.prefs.buffer_minutes
     out: Dict[Day, List[Tuple[int, int]]] = {d: [] for d in DAYS_IN_ORDER}
@@ -121,7 +142,7 @@ def _sleep_busy_by_day(data: InputData, sleep_abs: List[Tuple[int, int]]) -> Dic
             end = min(e_abs, cap)
             s = within
             e = within + (end - t)
-            out[day].append(_expand_interval(s, e, buf))
+            out[day].append(expand_interval(s, e, buf))
             t = end
     for d in out:
         out[d].sort()
@@ -134,7 +155,7 @@ def _lecture_busy_by_day(data: InputData) -> Dict[Day, List[Tuple[int, int]]]:
     for lec in data.lectures:
         if lec.online:
             continue
-        out[lec.day].append(_expand_interval(lec.start, lec.end, buf))
+        out[lec.day].append(expand_interval(lec.start, lec.end, buf))
     for d in out:
         out[d].sort()
     return out
@@ -153,61 +174,44 @@ def generate_free_slots(data: InputData) -> Dict[Day, List[Slot]]:
         t = prefs.earliest_start
         while t + prefs.slot_minutes <= prefs.latest_end:
             end = t + prefs.slot_minutes
-            if _is_free(t, end, busy):
+            if is_free(t, end, busy):
                 slots.append(Slot(day=day, start=t, end=end))
             t += prefs.slot_minutes
         free[day] = slots
     return free
 
 
-def _round_down_to_slot(n: int, slot: int) -> int:
-    if slot <= 0:
-        return n
-    return (n // slot) * slot
-
-
-def _round_up_to_slot(n: int, slot: int) -> int:
-    if slot <= 0:
-        return n
-    return ((n + slot - 1) // slot) * slot
-
-
 def _base_plan_blocks(data: InputData) -> List[TimeBlock]:
     blocks: List[TimeBlock] = []
     for lec in data.lectures:
         if lec.online:
             continue
         name = str(lec.course_name).strip() or "untitled course"
-        blocks.append(TimeBlock(day=lec.day, start=lec.start, end=lec.end, label=f"Lecture: {name}"))
+        kind = "Exam" if lec.exam else "Lecture"
+        blocks.append(TimeBlock(day=lec.day, start=lec.start, end=lec.end, label=f"{kind}: {name}"))
     blocks.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
     return blocks
 
 
-def _candidate_study_blocks(
-    data: InputData,
-    rng: random.Random,
-    sleep_abs: List[Tuple[int, int]],
-) -> List[TimeBlock]:
-    prefs = data.prefs
-    targets = compute_course_targets(data.lectures)
-    remaining = {k: int(v) for k, v in targets.items() if int(v) > 0}
-
+def week_busy_by_day(data: InputData, sleep_abs: List[Tuple[int, int]]) -> Dict[Day, List[Tuple[int, int]]]:
     lecture_busy = _lecture_busy_by_day(data)
     sleep_busy = _sleep_busy_by_day(data, sleep_abs)
+    return {day: sorted(lecture_busy[day] + sleep_busy[day]) for day in DAYS_IN_ORDER}
 
-    busy_by_day: Dict[Day, List[Tuple[int, int]]] = {}
-    for day in DAYS_IN_ORDER:
-        busy_by_day[day] = sorted(lecture_busy[day] + sleep_busy[day])
-
-    blocks_per_day: Dict[Day, int] = {day: 0 for day in DAYS_IN_ORDER}
-    last_course_day: Dict[Day, str] = {day: "" for day in DAYS_IN_ORDER}
-    study: List[TimeBlock] = []
 
+def _place_study_blocks(
+    data: InputData,
+    rng: random.Random,
+    remaining: Dict[str, int],
+    busy_by_day: Dict[Day, List[Tuple[int, int]]],
+    blocks_per_day: Dict[Day, int],
+    last_course_day: Dict[Day, str],
+    study: List[TimeBlock],
+    day_left: Dict[Day, int],
+) -> None:
+    prefs = data.prefs
     slot = prefs.slot_minutes
-    min_block = _round_up_to_slot(prefs.min_block, slot)
-    max_block = _round_down_to_slot(prefs.max_block, slot)
-    if max_block < min_block:
-        max_block = min_block
+    min_block, max_block = block_bounds(prefs)
 
     day_indices = list(range(len(DAYS_IN_ORDER)))
     rng.shuffle(day_indices)
@@ -237,13 +241,15 @@ def _candidate_study_blocks(
             day = DAYS_IN_ORDER[di]
             if blocks_per_day[day] >= prefs.prefer_blocks_per_day_max:
                 continue
+            if day_left[day] < min_block:
+                continue
 
             cname = weighted_pick_course(day)
             if cname is None:
                 continue
 
             desired = min(max_block, remaining[cname])
-            desired = _round_down_to_slot(desired, slot)
+            desired = round_down_to_slot(desired, slot)
             if desired < min_block:
                 desired = min_block
 
@@ -252,13 +258,14 @@ def _candidate_study_blocks(
 
             for t in starts:
                 end = t + desired
-                if _is_free(t, end, busy_by_day[day]):
+                if is_free(t, end, busy_by_day[day]):
                     study.append(TimeBlock(day=day, start=t, end=end, label=f"Study: {cname}"))
                     blocks_per_day[day] += 1
+                    day_left[day] -= desired
                     remaining[cname] = max(0, remaining[cname] - desired)
                     last_course_day[day] = cname
 
-                    bs, be = _expand_interval(t, end, prefs.buffer_minutes)
+                    bs, be = expand_interval(t, end, prefs.buffer_minutes)
                     _add_busy(busy_by_day[day], bs, be)
 
                     progressed = True
@@ -267,28 +274,300 @@ def _candidate_study_blocks(
         if not progressed:
             break
 
+
+def feasibility_report(data: InputData, sleep_abs: List[Tuple[int, int]] | None = None) -> FeasibilityReport:
+    if sleep_abs is None:
+        sleep_abs = reserve_sleep_week_abs(data)
+    targets = compute_course_targets(data.lectures)
+    return analyze_feasibility(week_busy_by_day(data, sleep_abs), data.prefs, targets)
+
+
+def _candidate_study_blocks(
+    data: InputData,
+    rng: random.Random,
+    sleep_abs: List[Tuple[int, int]],
+    report: FeasibilityReport,
+) -> List[TimeBlock]:
+    targets = report.course_cap
+    remaining = {k: int(v) for k, v in targets.items() if int(v) > 0}
+
+    busy_by_day = week_busy_by_day(data, sleep_abs)
+    blocks_per_day: Dict[Day, int] = {day: 0 for day in DAYS_IN_ORDER}
+    last_course_day: Dict[Day, str] = {day: "" for day in DAYS_IN_ORDER}
+    study: List[TimeBlock] = []
+
+    day_left = dict(report.day_capacity)
+
+    _place_study_blocks(data, rng, remaining, busy_by_day, blocks_per_day, last_course_day, study, day_left)
     return study
 
 
-def build_week_plan(data: InputData, seed: int = 1) -> List[TimeBlock]:
+@dataclass(frozen=True)
+class _BeamNode:
+    parent: _BeamNode | None
+    block: TimeBlock | None
+    remaining: Tuple[int, ...]
+    blocks_per_day: Tuple[int, ...]
+    day_left: Tuple[int, ...]
+    last_course: Tuple[int, ...]
+    key: int
+    score: float
+
+
+def _beam_study_blocks(node: _BeamNode | None) -> List[TimeBlock]:
+    out: List[TimeBlock] = []
+    while node is not None and node.block is not None:
+        out.append(node.block)
+        node = node.parent
+    out.reverse()
+    return out
+
+
+def _beam_expand(
+    data: InputData,
+    node: _BeamNode,
+    courses: List[str],
+    base: List[TimeBlock],
+    base_busy: Dict[Day, List[Tuple[int, int]]],
+    rng: random.Random,
+) -> List[_BeamNode]:
     prefs = data.prefs
-    sleep_abs = reserve_sleep_week_abs(data)
+    slot = prefs.slot_minutes
+    min_block, max_block = block_bounds(prefs)
+
+    open_courses = [ci for ci, left in enumerate(node.remaining) if left > 0]
+    if not open_courses:
+        return []
+
+    study = _beam_study_blocks(node)
+    busy_by_day = {d: list(v) for d, v in base_busy.items()}
+    for b in study:
+        busy_by_day[b.day].append(expand_interval(b.start, b.end, prefs.buffer_minutes))
+    prefix = base + study
+
+    children: List[_BeamNode] = []
+    for day_i, day in enumerate(DAYS_IN_ORDER):
+        if node.blocks_per_day[day_i] >= prefs.prefer_blocks_per_day_max:
+            continue
+        if node.day_left[day_i] < min_block:
+            continue
+
+        pool = [ci for ci in open_courses if ci != node.last_course[day_i]] or open_courses
+        pool.sort(key=lambda ci: -node.remaining[ci])
+
+        for ci in pool[:2]:
+            desired = round_down_to_slot(min(max_block, node.remaining[ci]), slot)
+            if desired < min_block:
+                desired = min_block
+
+            starts = [
+                t
+                for t in range(prefs.earliest_start, prefs.latest_end - desired + 1, slot)
+                if is_free(t, t + desired, busy_by_day[day])
+            ]
+            if not starts:
+                continue
+            picks = [starts[0]] + rng.sample(starts[1:], min(2, len(starts) - 1))
+
+            for t in picks:
+                block = TimeBlock(day=day, start=t, end=t + desired, label=f"Study: {courses[ci]}")
+                remaining = list(node.remaining)
+                remaining[ci] = max(0, remaining[ci] - desired)
+                blocks_per_day = list(node.blocks_per_day)
+                blocks_per_day[day_i] += 1
+                day_left = list(node.day_left)
+                day_left[day_i] -= desired
+                last_course = list(node.last_course)
+                last_course[day_i] = ci
+                children.append(
+                    _BeamNode(
+                        parent=node,
+                        block=block,
+                        remaining=tuple(remaining),
+                        blocks_per_day=tuple(blocks_per_day),
+                        day_left=tuple(day_left),
+                        last_course=tuple(last_course),
+                        key=node.key ^ hash((day_i, t, t + desired, ci)),
+                        score=score_plan(prefix + [block], prefs),
+                    )
+                )
+    return children
+
+
+def _beam_week_plan(
+    data: InputData,
+    seed: int,
+    sleep_abs: List[Tuple[int, int]],
+    report: FeasibilityReport,
+    base: List[TimeBlock],
+) -> List[TimeBlock]:
+    prefs = data.prefs
+    courses = [c for c, v in report.course_cap.items() if v > 0]
+    rng = random.Random(int(seed) * 1000003)
+    width = max(1, int(prefs.beam_width))
+    base_busy = week_busy_by_day(data, sleep_abs)
+
+    root = _BeamNode(
+        parent=None,
+        block=None,
+        remaining=tuple(report.course_cap[c] for c in courses),
+        blocks_per_day=tuple(0 for _ in DAYS_IN_ORDER),
+        day_left=tuple(report.day_capacity[d] for d in DAYS_IN_ORDER),
+        last_course=tuple(-1 for _ in DAYS_IN_ORDER),
+        key=0,
+        score=score_plan(base, prefs),
+    )
+
+    best = root
+    beam = [root]
+    while beam:
+        seen = set()
+        children: List[_BeamNode] = []
+        for node in beam:
+            kids = _beam_expand(data, node, courses, base, base_busy, rng)
+            if not kids:
+                if best is root or node.score > best.score:
+                    best = node
+                continue
+            for kid in kids:
+                if kid.key in seen:
+                    continue
+                seen.add(kid.key)
+                children.append(kid)
+        children.sort(key=lambda n: n.score, reverse=True)
+        beam = children[:width]
+
+    blocks = base + _beam_study_blocks(best)
+    blocks.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
+    return blocks
+
+
+def build_week_plan(data: InputData, seed: int = 1, sleep_abs: List[Tuple[int, int]] | None = None) -> List[TimeBlock]:
+    prefs = data.prefs
+    if sleep_abs is None:
+        sleep_abs = reserve_sleep_week_abs(data)
     base = _base_plan_blocks(data)
 
+    report = feasibility_report(data, sleep_abs)
+    if report.total_capacity <= 0 or not any(v > 0 for v in report.course_cap.values()):
+        return base
+    if prefs.construction == "beam":
+        return _beam_week_plan(data, seed, sleep_abs, report, base)
+
     best_blocks = None
     best_score = None
 
     n = max(1, int(prefs.candidate_count))
     base_seed = int(seed)
 
+    bound = None if report.feasible else sum(report.course_cap.values())
+
     for i in range(n):
         rng = random.Random(base_seed * 1000003 + (i + 1))
-        study = _candidate_study_blocks(data, rng, sleep_abs)
+        study = _candidate_study_blocks(data, rng, sleep_abs, report)
         blocks = base + study
         blocks.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
         s = score_plan(blocks, prefs)
         if best_score is None or s > best_score:
             best_score = s
             best_blocks = blocks
+        if bound is not None and sum(b.end - b.start for b in study) >= bound:
+            break
 
     return best_blocks if best_blocks is not None else base
+
+
+def _keep_previous_study(
+    data: InputData,
+    previous: List[TimeBlock],
+    remaining: Dict[str, int],
+    busy_by_day: Dict[Day, List[Tuple[int, int]]],
+    blocks_per_day: Dict[Day, int],
+    last_course_day: Dict[Day, str],
+) -> List[TimeBlock]:
+    prefs = data.prefs
+    slot = prefs.slot_minutes
+    min_block, max_block = block_bounds(prefs)
+
+    kept: List[TimeBlock] = []
+    studies = [b for b in previous if course_from_label(b.label)]
+    studies.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
+    for b in studies:
+        cname = course_from_label(b.label)
+        left = remaining.get(cname, 0)
+        if left <= 0:
+            continue
+        dur = b.end - b.start
+        allowed = max(min_block, round_down_to_slot(min(max_block, left), slot))
+        if dur < min_block or dur > allowed:
+            continue
+        if b.start < prefs.earliest_start or b.end > prefs.latest_end:
+            continue
+        if blocks_per_day[b.day] >= prefs.prefer_blocks_per_day_max:
+            continue
+        if not is_free(b.start, b.end, busy_by_day[b.day]):
+            continue
+
+        kept.append(b)
+        blocks_per_day[b.day] += 1
+        remaining[cname] = max(0, left - dur)
+        last_course_day[b.day] = cname
+        bs, be = expand_interval(b.start, b.end, prefs.buffer_minutes)
+        _add_busy(busy_by_day[b.day], bs, be)
+    return kept
+
+
+def repair_week_plan(
+    data: InputData,
+    previous: List[TimeBlock],
+    seed: int = 1,
+    sleep_abs: List[Tuple[int, int]] | None = None,
+) -> List[TimeBlock]:
+    prefs = data.prefs
+    if sleep_abs is None:
+        sleep_abs = reserve_sleep_week_abs(data)
+    base = _base_plan_blocks(data)
+
+    report = feasibility_report(data, sleep_abs)
+    remaining = {k: int(v) for k, v in report.course_cap.items() if int(v) > 0}
+    busy_by_day = week_busy_by_day(data, sleep_abs)
+    blocks_per_day: Dict[Day, int] = {day: 0 for day in DAYS_IN_ORDER}
+    last_course_day: Dict[Day, str] = {day: "" for day in DAYS_IN_ORDER}
+
+    kept = _keep_previous_study(data, previous, remaining, busy_by_day, blocks_per_day, last_course_day)
+    day_left = dict(report.day_capacity)
+    for b in kept:
+        day_left[b.day] -= b.end - b.start
+
+    best_blocks = sorted(base + kept, key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
+    if not any(v > 0 for v in remaining.values()):
+        return best_blocks
+
+    best_score = None
+    n = max(1, int(prefs.candidate_count))
+    base_seed = int(seed)
+    bound = None if report.feasible else sum(report.course_cap.values())
+
+    for i in range(n):
+        rng = random.Random(base_seed * 1000003 + (i + 1))
+        study = list(kept)
+        _place_study_blocks(
+            data,
+            rng,
+            dict(remaining),
+            {d: list(v) for d, v in busy_by_day.items()},
+            dict(blocks_per_day),
+            dict(last_course_day),
+            study,
+            dict(day_left),
+        )
+        blocks = base + study
+        blocks.sort(key=lambda b: (DAYS_IN_ORDER.index(b.day), b.start))
+        s = score_plan(blocks, prefs)
+        if best_score is None or s > best_score:
+            best_score = s
+            best_blocks = blocks
+        if bound is not None and sum(b.end - b.start for b in study) >= bound:
+            break
+
+    return best_blocks
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from scheduler.models import (
+    DAYS_IN_ORDER,
+    Day,
+    Preferences,
+    block_bounds,
+    round_down_to_slot,
+    round_up_to_slot,
+)
+
+
+@dataclass(frozen=True)
+class FeasibilityReport:
+    day_capacity: Dict[Day, int]
+    total_capacity: int
+    targets: Dict[str, int]
+    course_max: Dict[str, int]
+    course_cap: Dict[str, int]
+
+    @property
+    def total_target(self) -> int:
+        return sum(self.targets.values())
+
+    @property
+    def feasible(self) -> bool:
+        return self.total_target <= self.total_capacity
+
+    @property
+    def shortfall(self) -> int:
+        return max(0, self.total_target - self.total_capacity)
+
+
+def _free_windows(busy: List[Tuple[int, int]], prefs: Preferences) -> List[Tuple[int, int]]:
+    out: List[Tuple[int, int]] = []
+    t = prefs.earliest_start
+    for s, e in sorted(busy):
+        if s > t:
+            out.append((t, min(s, prefs.latest_end)))
+        t = max(t, e)
+        if t >= prefs.latest_end:
+            break
+    if t < prefs.latest_end:
+        out.append((t, prefs.latest_end))
+    return [(s, e) for s, e in out if e > s]
+
+
+def _window_capacity(start: int, end: int, prefs: Preferences, min_block: int, max_block: int, k_max: int) -> List[int]:
+    slot = prefs.slot_minutes
+    first = prefs.earliest_start + round_up_to_slot(start - prefs.earliest_start, slot)
+    usable = round_down_to_slot(end - first, slot)
+    gap = round_up_to_slot(prefs.buffer_minutes, slot)
+
+    caps = [0]
+    for j in range(1, k_max + 1):
+        span = usable - (j - 1) * gap
+        if span < j * min_block:
+            break
+        caps.append(min(j * max_block, span))
+    return caps
+
+
+def _day_capacity(busy: List[Tuple[int, int]], prefs: Preferences, min_block: int, max_block: int) -> int:
+    k_max = max(0, int(prefs.prefer_blocks_per_day_max))
+    best = [0] + [-1] * k_max
+    for s, e in _free_windows(busy, prefs):
+        caps = _window_capacity(s, e, prefs, min_block, max_block, k_max)
+        nxt = list(best)
+        for k in range(k_max + 1):
+            if best[k] < 0:
+                continue
+            for j in range(1, len(caps)):
+                if k + j > k_max:
+                    break
+                nxt[k + j] = max(nxt[k + j], best[k] + caps[j])
+        best = nxt
+    return max(best)
+
+
+def _fair_share(targets: Dict[str, int], capacity: int, min_block: int, max_block: int, slot: int) -> Dict[str, int]:
+    unit = max(1, max_block)
+    cap: Dict[str, int] = {c: 0 for c in targets}
+    left = capacity
+    order = sorted(targets, key=lambda c: (targets[c], c))
+    for i, c in enumerate(order):
+        share = left // (len(order) - i) // unit * unit
+        give = min(targets[c], share)
+        cap[c] = give
+        left -= give
+
+    progressed = True
+    while left >= unit and progressed:
+        progressed = False
+        for c in order:
+            extra = min(unit, targets[c] - cap[c], left)
+            if extra > 0:
+                cap[c] += extra
+                left -= extra
+                progressed = True
+
+    rest = round_down_to_slot(left, slot)
+    if rest >= min_block:
+        for c in order:
+            extra = min(targets[c] - cap[c], rest)
+            if extra >= min_block:
+                cap[c] += extra
+                break
+    return cap
+
+
+def analyze_feasibility(
+    busy_by_day: Dict[Day, List[Tuple[int, int]]],
+    prefs: Preferences,
+    targets: Dict[str, int],
+) -> FeasibilityReport:
+    slot = prefs.slot_minutes
+    min_block, max_block = block_bounds(prefs)
+
+    day_capacity = {d: _day_capacity(busy_by_day.get(d, []), prefs, min_block, max_block) for d in DAYS_IN_ORDER}
+    total = sum(day_capacity.values())
+
+    positive = {c: int(v) for c, v in targets.items() if int(v) > 0}
+    course_max = {c: min(v, total) for c, v in positive.items()}
+    if sum(positive.values()) <= total:
+        course_cap = dict(positive)
+    else:
+        course_cap = _fair_share(positive, total, min_block, max_block, slot)
+
+    return FeasibilityReport(
+        day_capacity=day_capacity,
+        total_capacity=total,
+        targets=positive,
+        course_max=course_max,
+        course_cap=course_cap,
+    )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import datetime as dt
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Literal, Tuple
 from pydantic import BaseModel, Field
 
 Minute = int
@@ -31,6 +32,18 @@ def hhmm_to_minutes(hhmm: str) -> int:
     return int(hh) * 60 + int(mm)
 
 
+def round_down_to_slot(n: int, slot: int) -> int:
+    if slot <= 0:
+        return n
+    return (n // slot) * slot
+
+
+def round_up_to_slot(n: int, slot: int) -> int:
+    if slot <= 0:
+        return n
+    return ((n + slot - 1) // slot) * slot
+
+
 class Lecture(BaseModel):
     course_name: str
     day: Day
@@ -39,6 +52,7 @@ class Lecture(BaseModel):
     multiplier: float = Field(ge=0.0, default=2.0)
     online: bool = False
     color_hex: str = "#4e79a7"
+    exam: bool = False
 
     @property
     def duration_minutes(self) -> int:
@@ -63,6 +77,8 @@ class Preferences(BaseModel):
     buffer_minutes: int = 30
 
     candidate_count: int = 30
+    construction: Literal["random", "beam"] = "random"
+    beam_width: int = 4
 
     weight_spread: float = 1.0
     weight_late: float = 1.0
@@ -75,6 +91,33 @@ class InputData(BaseModel):
     prefs: Preferences
 
 
+class StudyRoom(BaseModel):
+    name: str
+    capacity: int = Field(ge=1, default=1)
+
+
+class ExceptionKind(str, Enum):
+    holiday = "holiday"
+    cancelled = "cancelled"
+    exam = "exam"
+
+
+class DatedException(BaseModel):
+    date: dt.date
+    kind: ExceptionKind
+    course_name: str = ""
+    start: Minute = 0
+    end: Minute = 0
+    multiplier: float = Field(ge=0.0, default=0.0)
+
+
+class SemesterData(BaseModel):
+    base: InputData
+    start_date: dt.date
+    weeks: int = Field(ge=1, default=15)
+    exceptions: List[DatedException] = Field(default_factory=list)
+
+
 class TimeBlock(BaseModel):
     day: Day
     start: Minute
@@ -90,5 +133,14 @@ def compute_course_targets(lectures: List[Lecture]) -> Dict[str, int]:
     return totals
 
 
+def block_bounds(prefs: Preferences) -> Tuple[int, int]:
+    slot = prefs.slot_minutes
+    min_block = round_up_to_slot(prefs.min_block, slot)
+    max_block = round_down_to_slot(prefs.max_block, slot)
+    if max_block < min_block:
+        max_block = min_block
+    return min_block, max_block
+
+
 def overlaps(a_start: int, a_end: int, b_start: int, b_end: int) -> bool:
     return a_start < b_end and b_start < a_end
@@ -12,7 +12,7 @@ def _clamp(v: float, lo: float, hi: float) -> float:
 def _busy_intervals_from_blocks(blocks: List[TimeBlock]) -> Dict[Day, List[Tuple[int, int]]]:
     out: Dict[Day, List[Tuple[int, int]]] = {d: [] for d in DAYS_IN_ORDER}
     for b in blocks:
-        if b.label.startswith("Lecture:") or b.label.startswith("Sleep"):
+        if b.label.startswith(("Lecture:", "Exam:", "Sleep")):
             out[b.day].append((b.start, b.end))
     for d in out:
         out[d].sort()
@@ -23,7 +23,7 @@ def _study_blocks(blocks: List[TimeBlock]) -> List[TimeBlock]:
     return [b for b in blocks if b.label.startswith("Study:")]
 
 
-def _course_from_label(label: str) -> str:
+def course_from_label(label: str) -> str:
     if label.startswith("Study:"):
         return label[len("Study:") :].strip()
     return ""
@@ -76,7 +76,7 @@ def score_plan(blocks: List[TimeBlock], prefs: Preferences) -> float:
         day_studies = [b for b in studies if b.day == d]
         day_studies.sort(key=lambda x: x.start)
         for i in range(1, len(day_studies)):
-            if _course_from_label(day_studies[i].label) == _course_from_label(day_studies[i - 1].label):
+            if course_from_label(day_studies[i].label) == course_from_label(day_studies[i - 1].label):
                 variety_pen += 1.0
 
     score = 0.0
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Dict, List, Tuple
+
+from scheduler.engine import build_week_plan, repair_week_plan, reserve_sleep_week_abs, reuse_sleep_week_abs
+from scheduler.models import (
+    DAYS_IN_ORDER,
+    DatedException,
+    ExceptionKind,
+    InputData,
+    Lecture,
+    SemesterData,
+    TimeBlock,
+)
+
+Fingerprint = Tuple[Tuple[str, str, int, int, float, bool, bool], ...]
+
+
+def semester_week_starts(sem: SemesterData) -> List[dt.date]:
+    first = sem.start_date - dt.timedelta(days=sem.start_date.weekday())
+    return [first + dt.timedelta(weeks=i) for i in range(sem.weeks)]
+
+
+def _exceptions_by_date(sem: SemesterData) -> Dict[dt.date, List[DatedException]]:
+    out: Dict[dt.date, List[DatedException]] = {}
+    for ex in sem.exceptions:
+        out.setdefault(ex.date, []).append(ex)
+    return out
+
+
+def _course_name(name: str) -> str:
+    return str(name).strip() or "untitled course"
+
+
+def _is_cancelled(lec: Lecture, exceptions: List[DatedException]) -> bool:
+    for ex in exceptions:
+        if ex.kind == ExceptionKind.holiday:
+            return True
+        if ex.kind == ExceptionKind.cancelled:
+            if not ex.course_name.strip() or _course_name(ex.course_name) == _course_name(lec.course_name):
+                return True
+    return False
+
+
+def effective_lectures(
+    lectures: List[Lecture],
+    week_start: dt.date,
+    exceptions_by_date: Dict[dt.date, List[DatedException]],
+) -> List[Lecture]:
+    """Lectures for one dated week; study targets follow from these as usual.
+
+    A holiday or cancellation drops the lecture and with it that week's study target for it.
+    An exam sitting is busy time labelled "Exam: <course>" and adds duration * multiplier
+    study minutes for its course, none with the default multiplier of 0.
+    """
+    colors = {_course_name(lec.course_name): lec.color_hex for lec in lectures}
+
+    out: List[Lecture] = []
+    for lec in lectures:
+        date = week_start + dt.timedelta(days=DAYS_IN_ORDER.index(lec.day))
+        if _is_cancelled(lec, exceptions_by_date.get(date, [])):
+            continue
+        out.append(lec)
+
+    for day_i, day in enumerate(DAYS_IN_ORDER):
+        date = week_start + dt.timedelta(days=day_i)
+        for ex in exceptions_by_date.get(date, []):
+            if ex.kind != ExceptionKind.exam or ex.end <= ex.start:
+                continue
+            name = _course_name(ex.course_name)
+            out.append(
+                Lecture(
+                    course_name=name,
+                    day=day,
+                    start=ex.start,
+                    end=ex.end,
+                    multiplier=ex.multiplier,
+                    color_hex=colors.get(name, "#4e79a7"),
+                    exam=True,
+                )
+            )
+    return out
+
+
+def lecture_fingerprint(lectures: List[Lecture]) -> Fingerprint:
+    return tuple(
+        sorted(
+            (
+                _course_name(lec.course_name),
+                lec.day.value,
+                lec.start,
+                lec.end,
+                float(lec.multiplier),
+                bool(lec.online),
+                bool(lec.exam),
+            )
+            for lec in lectures
+        )
+    )
+
+
+def _week_has_exceptions(week_start: dt.date, exceptions_by_date: Dict[dt.date, List[DatedException]]) -> bool:
+    return any((week_start + dt.timedelta(days=i)) in exceptions_by_date for i in range(len(DAYS_IN_ORDER)))
+
+
+def build_semester_plan(sem: SemesterData, seed: int = 1) -> Dict[dt.date, List[TimeBlock]]:
+    base = sem.base
+    template_sleep = reserve_sleep_week_abs(base)
+    template = build_week_plan(base, seed=seed, sleep_abs=template_sleep)
+    plans_by_fingerprint: Dict[Fingerprint, List[TimeBlock]] = {lecture_fingerprint(base.lectures): template}
+    exceptions_by_date = _exceptions_by_date(sem)
+
+    out: Dict[dt.date, List[TimeBlock]] = {}
+    for week_start in semester_week_starts(sem):
+        if not _week_has_exceptions(week_start, exceptions_by_date):
+            out[week_start] = template
+            continue
+
+        lectures = effective_lectures(base.lectures, week_start, exceptions_by_date)
+        fp = lecture_fingerprint(lectures)
+        plan = plans_by_fingerprint.get(fp)
+        if plan is None:
+            week_data = InputData(lectures=lectures, prefs=base.prefs)
+            sleep_abs = reuse_sleep_week_abs(week_data, template_sleep)
+            plan = repair_week_plan(week_data, template, seed=seed, sleep_abs=sleep_abs)
+            plans_by_fingerprint[fp] = plan
+        out[week_start] = plan
+    return out
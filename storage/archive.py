@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from scheduler.models import DAYS_IN_ORDER, TimeBlock
+
+DEFAULT_ARCHIVE_PATH = Path("plans.bin")
+
+MAGIC = b"SPLA"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIIQQQQQ")
+RECORD = struct.Struct("<BHHBI")
+INDEX = struct.Struct("<IIQI")
+OFFSET = struct.Struct("<I")
+COUNTS = struct.Struct("<II")
+
+KIND_OTHER = 0
+KIND_LECTURE = 1
+KIND_STUDY = 2
+
+_PREFIXES = {KIND_LECTURE: "Lecture:", KIND_STUDY: "Study:"}
+
+PlanKey = Tuple[str, int]
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, s: str) -> int:
+        i = self.ids.get(s)
+        if i is None:
+            i = len(self.values)
+            self.ids[s] = i
+            self.values.append(s)
+        return i
+
+
+def _split_label(label: str) -> Tuple[int, str]:
+    """Split off a known prefix only when _join_label gives the label back unchanged."""
+    for kind, prefix in _PREFIXES.items():
+        if label.startswith(prefix + " "):
+            name = label[len(prefix) + 1 :]
+            if name and name == name.strip():
+                return kind, name
+    return KIND_OTHER, label
+
+
+def _join_label(kind: int, name: str) -> str:
+    prefix = _PREFIXES.get(kind)
+    if prefix is None:
+        return name
+    return f"{prefix} {name}"
+
+
+def pack_blocks(blocks: List[TimeBlock], intern) -> bytes:
+    """Pack records against a shared string table; intern maps a name to its id.
+
+    For a self-contained buffer use blocks_to_bytes / bytes_to_blocks.
+    """
+    out = bytearray(RECORD.size * len(blocks))
+    for i, b in enumerate(blocks):
+        kind, name = _split_label(b.label)
+        RECORD.pack_into(out, i * RECORD.size, DAYS_IN_ORDER.index(b.day), b.start, b.end, kind, intern(name))
+    return bytes(out)
+
+
+def unpack_blocks(buf, name_of) -> List[TimeBlock]:
+    return [
+        TimeBlock(day=DAYS_IN_ORDER[day_i], start=start, end=end, label=_join_label(kind, name_of(sid)))
+        for day_i, start, end, kind, sid in RECORD.iter_unpack(buf)
+    ]
+
+
+def blocks_to_bytes(blocks: List[TimeBlock]) -> bytes:
+    strings = _StringTable()
+    records = pack_blocks(blocks, strings.intern)
+    encoded = [s.encode("utf-8") for s in strings.values]
+    offsets = bytearray()
+    pos = 0
+    for s in encoded:
+        offsets += OFFSET.pack(pos)
+        pos += len(s)
+    offsets += OFFSET.pack(pos)
+    return COUNTS.pack(len(blocks), len(encoded)) + records + bytes(offsets) + b"".join(encoded)
+
+
+def bytes_to_blocks(buf) -> List[TimeBlock]:
+    view = memoryview(buf)
+    n_blocks, n_strings = COUNTS.unpack_from(view, 0)
+    records_off = COUNTS.size
+    offsets_off = records_off + n_blocks * RECORD.size
+    blob_off = offsets_off + (n_strings + 1) * OFFSET.size
+
+    def name_of(i: int) -> str:
+        (s,) = OFFSET.unpack_from(view, offsets_off + i * OFFSET.size)
+        (e,) = OFFSET.unpack_from(view, offsets_off + (i + 1) * OFFSET.size)
+        return str(view[blob_off + s : blob_off + e], "utf-8")
+
+    return unpack_blocks(view[records_off:offsets_off], name_of)
+
+
+def save_archive(plans: Mapping[PlanKey, List[TimeBlock]], path: Path = DEFAULT_ARCHIVE_PATH) -> None:
+    write_archive(plans.items(), path)
+
+
+def write_archive(plans: Iterable[Tuple[PlanKey, List[TimeBlock]]], path: Path = DEFAULT_ARCHIVE_PATH) -> None:
+    strings = _StringTable()
+    index: List[Tuple[int, int, int, int]] = []
+    n_blocks = 0
+
+    with path.open("wb") as f:
+        f.write(b"\0" * HEADER.size)
+        blocks_off = HEADER.size
+        for (student, week), blocks in plans:
+            f.write(pack_blocks(blocks, strings.intern))
+            index.append((strings.intern(str(student)), int(week), n_blocks, len(blocks)))
+            n_blocks += len(blocks)
+
+        encoded = [s.encode("utf-8") for s in strings.values]
+        str_off_off = blocks_off + n_blocks * RECORD.size
+        pos = 0
+        for s in encoded:
+            f.write(OFFSET.pack(pos))
+            pos += len(s)
+        f.write(OFFSET.pack(pos))
+
+        str_blob_off = str_off_off + (len(encoded) + 1) * OFFSET.size
+        f.write(b"".join(encoded))
+
+        index_off = str_blob_off + pos
+        index.sort(key=lambda r: (encoded[r[0]], r[1]))
+        for row in index:
+            f.write(INDEX.pack(*row))
+
+        f.seek(0)
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                RECORD.size,
+                len(encoded),
+                len(index),
+                n_blocks,
+                blocks_off,
+                str_off_off,
+                str_blob_off,
+                index_off,
+            )
+        )
+
+
+class PlanArchive:
+    def __init__(self, path: Path = DEFAULT_ARCHIVE_PATH) -> None:
+        self._file = path.open("rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        (
+            magic,
+            version,
+            record_size,
+            self.n_strings,
+            self.n_index,
+            self.n_blocks,
+            self._blocks_off,
+            self._str_off_off,
+            self._str_blob_off,
+            self._index_off,
+        ) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a plan archive")
+        self._names: Dict[int, str] = {}
+
+    def close(self) -> None:
+        """Close the mapping and file; slices from week_view must be released first.
+
+        Raises BufferError while such a slice is still held and leaves the archive usable.
+        """
+        if self._mm.closed:
+            return
+        self._view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            self._view = memoryview(self._mm)
+            raise BufferError("release the memoryviews returned by week_view before closing the archive") from None
+        self._file.close()
+
+    def __enter__(self) -> PlanArchive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_index
+
+    def _string_bytes(self, i: int) -> memoryview:
+        (s,) = OFFSET.unpack_from(self._mm, self._str_off_off + i * OFFSET.size)
+        (e,) = OFFSET.unpack_from(self._mm, self._str_off_off + (i + 1) * OFFSET.size)
+        return self._view[self._str_blob_off + s : self._str_blob_off + e]
+
+    def name_of(self, i: int) -> str:
+        name = self._names.get(i)
+        if name is None:
+            name = str(self._string_bytes(i), "utf-8")
+            self._names[i] = name
+        return name
+
+    def _index_row(self, i: int) -> Tuple[int, int, int, int]:
+        return INDEX.unpack_from(self._mm, self._index_off + i * INDEX.size)
+
+    def _lower_bound(self, student: bytes, week: int) -> int:
+        lo, hi = 0, self.n_index
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sid, w, _, _ = self._index_row(mid)
+            if (bytes(self._string_bytes(sid)), w) < (student, week):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, student: str, week: int) -> Optional[Tuple[int, int]]:
+        key = student.encode("utf-8")
+        i = self._lower_bound(key, int(week))
+        if i >= self.n_index:
+            return None
+        sid, w, first, count = self._index_row(i)
+        if w != int(week) or bytes(self._string_bytes(sid)) != key:
+            return None
+        return first, count
+
+    def week_view(self, student: str, week: int) -> Optional[memoryview]:
+        """Zero-copy slice of the week's records; call .release() on it before close()."""
+        found = self._find(student, week)
+        if found is None:
+            return None
+        first, count = found
+        s = self._blocks_off + first * RECORD.size
+        return self._view[s : s + count * RECORD.size]
+
+    def week_records(self, student: str, week: int) -> Iterator[Tuple[int, int, int, int, int]]:
+        view = self.week_view(student, week)
+        if view is None:
+            return iter(())
+        with view:
+            records = bytes(view)
+        return RECORD.iter_unpack(records)
+
+    def week_blocks(self, student: str, week: int) -> Optional[List[TimeBlock]]:
+        view = self.week_view(student, week)
+        if view is None:
+            return None
+        with view:
+            return unpack_blocks(view, self.name_of)
+
+    def weeks(self, student: str) -> List[int]:
+        key = student.encode("utf-8")
+        out: List[int] = []
+        i = self._lower_bound(key, 0)
+        while i < self.n_index:
+            sid, w, _, _ = self._index_row(i)
+            if bytes(self._string_bytes(sid)) != key:
+                break
+            out.append(w)
+            i += 1
+        return out
+
+    def keys(self) -> Iterator[PlanKey]:
+        for i in range(self.n_index):
+            sid, w, _, _ = self._index_row(i)
+            yield self.name_of(sid), w
+
+
+def open_archive(path: Path = DEFAULT_ARCHIVE_PATH) -> PlanArchive:
+    return PlanArchive(path)
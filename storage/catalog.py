@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from scheduler.models import Day, Lecture, hhmm_to_minutes
+
+BATCH_SIZE = 500
+
+RowKey = Tuple[str, str, str, str, int]
+Record = Tuple[str, Day, int, int, float, bool, str]
+
+_LECTURES = TypeAdapter(List[Lecture])
+
+_FIELDS = ("course_name", "section", "day", "start", "end", "multiplier", "online", "color_hex")
+_ALIASES = {"course": "course_name", "name": "course_name", "section_id": "section"}
+_REQUIRED = ("course_name", "day", "start", "end")
+
+
+@dataclass
+class ImportStats:
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    dropped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class BadRow:
+    line: int
+    message: str
+    fatal: bool = False
+
+
+def _json_line(line: str, n: int) -> object:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return BadRow(line=n, message=f"invalid json: {e.msg}")
+
+
+def _column(name: object) -> str:
+    key = str(name).strip().lower()
+    return _ALIASES.get(key, key)
+
+
+def iter_csv_rows(fp: TextIO) -> Iterator[object]:
+    reader = csv.DictReader(fp)
+    columns = {_column(c) for c in reader.fieldnames or ()}
+    missing = [c for c in _REQUIRED if c not in columns]
+    if missing:
+        yield BadRow(line=1, message=f"missing columns: {', '.join(missing)}", fatal=True)
+        return
+    yield from reader
+
+
+def iter_json_rows(fp: TextIO) -> Iterator[object]:
+    first = ""
+    n = 0
+    while not first:
+        line = fp.readline()
+        if not line:
+            return
+        n += 1
+        first = line.strip()
+
+    if first.startswith("{") and first.endswith("}"):
+        row = _json_line(first, n)
+        if isinstance(row, BadRow) or (isinstance(row, dict) and "sections" not in row):
+            yield row
+            for line in fp:
+                n += 1
+                line = line.strip()
+                if line:
+                    yield _json_line(line, n)
+            return
+
+    doc = _json_line(first + fp.read(), n)
+    if isinstance(doc, BadRow):
+        yield BadRow(line=doc.line, message=doc.message, fatal=True)
+        return
+    if isinstance(doc, dict):
+        if "sections" not in doc:
+            yield BadRow(line=n, message="expected a list of sections or an object with a sections list", fatal=True)
+            return
+        doc = doc["sections"]
+    if not isinstance(doc, list):
+        yield BadRow(line=n, message="expected a list of sections", fatal=True)
+        return
+    yield from doc
+
+
+def iter_file_rows(path: Path) -> Iterator[object]:
+    with path.open("r", encoding="utf-8", newline="") as fp:
+        if path.suffix.lower() == ".csv":
+            yield from iter_csv_rows(fp)
+        else:
+            yield from iter_json_rows(fp)
+
+
+def _normalize(row: Mapping[str, object]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for k, v in row.items():
+        key = _column(k)
+        if key in _FIELDS and v is not None:
+            out[key] = str(v).strip()
+    return out
+
+
+def _row_key(raw: Dict[str, str]) -> Tuple[str, str, str, str]:
+    return (
+        raw.get("course_name", "") or "untitled course",
+        raw.get("section", ""),
+        raw.get("day", "")[:3].lower(),
+        raw.get("start", ""),
+    )
+
+
+def _minutes(v: str) -> int:
+    return hhmm_to_minutes(v) if ":" in v else int(v)
+
+
+def _lecture_input(raw: Dict[str, str]) -> Dict[str, object]:
+    out: Dict[str, object] = {
+        "course_name": raw.get("course_name", "") or "untitled course",
+        "day": raw.get("day", "")[:3].capitalize(),
+        "start": _minutes(raw.get("start", "")),
+        "end": _minutes(raw.get("end", "")),
+    }
+    if raw.get("multiplier"):
+        out["multiplier"] = raw["multiplier"]
+    if raw.get("online"):
+        out["online"] = raw["online"].lower() in ("1", "true", "yes", "y")
+    if raw.get("color_hex"):
+        out["color_hex"] = raw["color_hex"]
+    return out
+
+
+def _record(lec: Lecture) -> Record:
+    return (lec.course_name, lec.day, lec.start, lec.end, lec.multiplier, lec.online, lec.color_hex)
+
+
+def _lecture(rec: Record) -> Lecture:
+    course_name, day, start, end, multiplier, online, color_hex = rec
+    return Lecture.model_construct(
+        course_name=course_name,
+        day=day,
+        start=start,
+        end=end,
+        multiplier=multiplier,
+        online=online,
+        color_hex=color_hex,
+    )
+
+
+class Catalog:
+    def __init__(self) -> None:
+        self._courses: Dict[str, Dict[str, Dict[RowKey, Record]]] = {}
+        self._fingerprints: Dict[RowKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def courses(self) -> List[str]:
+        return sorted(self._courses)
+
+    def sections(self, course: str) -> List[str]:
+        return sorted(self._courses.get(course, {}))
+
+    def lectures(self, course: str, section: Optional[str] = None) -> List[Lecture]:
+        by_section = self._courses.get(course, {})
+        if section is not None:
+            return [_lecture(rec) for rec in by_section.get(section, {}).values()]
+        return [_lecture(rec) for rows in by_section.values() for rec in rows.values()]
+
+    def _put(self, key: RowKey, fp: int, lec: Lecture) -> None:
+        course, section = key[0], key[1]
+        self._courses.setdefault(course, {}).setdefault(section, {})[key] = _record(lec)
+        self._fingerprints[key] = fp
+
+    def _drop(self, key: RowKey) -> None:
+        course, section = key[0], key[1]
+        self._fingerprints.pop(key, None)
+        by_section = self._courses.get(course)
+        if by_section is None:
+            return
+        rows = by_section.get(section)
+        if rows is not None:
+            rows.pop(key, None)
+            if not rows:
+                del by_section[section]
+        if not by_section:
+            del self._courses[course]
+
+    def _reject(self, key: RowKey, message: str, stats: ImportStats) -> None:
+        stats.errors.append(f"{key}: {message}")
+        if key in self._fingerprints:
+            self._drop(key)
+            stats.dropped += 1
+
+    def _apply_batch(self, batch: List[Tuple[RowKey, int, Dict[str, str]]], stats: ImportStats) -> None:
+        inputs: List[Dict[str, object]] = []
+        ok: List[Tuple[RowKey, int]] = []
+        for key, fp, raw in batch:
+            try:
+                inputs.append(_lecture_input(raw))
+                ok.append((key, fp))
+            except ValueError as e:
+                self._reject(key, str(e), stats)
+
+        try:
+            lectures = _LECTURES.validate_python(inputs)
+        except ValidationError:
+            lectures = []
+            keep: List[Tuple[RowKey, int]] = []
+            for (key, fp), item in zip(ok, inputs):
+                try:
+                    lectures.append(Lecture.model_validate(item))
+                    keep.append((key, fp))
+                except ValidationError as e:
+                    self._reject(key, e.errors()[0]["msg"], stats)
+            ok = keep
+
+        for (key, fp), lec in zip(ok, lectures):
+            if key in self._fingerprints:
+                stats.changed += 1
+            else:
+                stats.added += 1
+            self._put(key, fp, lec)
+
+    def import_rows(self, rows: Iterable[object], full: bool = True) -> ImportStats:
+        stats = ImportStats()
+        seen: Dict[Tuple[str, str, str, str], int] = {}
+        keys: set = set()
+        batch: List[Tuple[RowKey, int, Dict[str, str]]] = []
+        complete = True
+
+        try:
+            for i, row in enumerate(rows, start=1):
+                if isinstance(row, BadRow):
+                    stats.errors.append(f"line {row.line}: {row.message}")
+                    complete = complete and not row.fatal
+                    continue
+                if not isinstance(row, Mapping):
+                    stats.errors.append(f"row {i}: expected an object, got {type(row).__name__}")
+                    continue
+                self._stage(row, seen, keys, batch, stats)
+                if len(batch) >= BATCH_SIZE:
+                    self._apply_batch(batch, stats)
+                    batch = []
+        except (ValueError, csv.Error) as e:
+            stats.errors.append(f"import stopped: {e}")
+            complete = False
+        if batch:
+            self._apply_batch(batch, stats)
+
+        if full and complete:
+            stale = [k for k in self._fingerprints if k not in keys]
+            if stats.added + stats.changed + stats.unchanged == 0:
+                if stale:
+                    stats.errors.append(f"no valid rows; kept {len(stale)} existing rows")
+                stale = []
+            for key in stale:
+                self._drop(key)
+                stats.removed += 1
+        return stats
+
+    def _stage(
+        self,
+        row: Mapping[str, object],
+        seen: Dict[Tuple[str, str, str, str], int],
+        keys: set,
+        batch: List[Tuple[RowKey, int, Dict[str, str]]],
+        stats: ImportStats,
+    ) -> None:
+        raw = _normalize(row)
+        base = _row_key(raw)
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        key = base + (n,)
+        keys.add(key)
+        fp = hash(tuple(raw.get(f, "") for f in _FIELDS))
+        if self._fingerprints.get(key) == fp:
+            stats.unchanged += 1
+            return
+        batch.append((key, fp, raw))
+
+    def import_file(self, path: Path, full: bool = True) -> ImportStats:
+        return self.import_rows(iter_file_rows(path), full=full)